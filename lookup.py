@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 
 import asyncio
+import os
 import time
 import logging
 from argparse import ArgumentParser
@@ -8,11 +9,8 @@ from src.client import PkarrClient
 from src.public_key import PublicKey
 from src.keypair import Keypair
 from src.errors import PkarrError
-import bencodepy
 
 
-DEFAULT_MINIMUM_TTL = 300  # 5 minutes
-DEFAULT_MAXIMUM_TTL = 24 * 60 * 60  # 24 hours
 DEFAULT_BOOTSTRAP_NODES = [
     "router.bittorrent.com:6881",
     "router.utorrent.com:6881",
@@ -20,7 +18,7 @@ DEFAULT_BOOTSTRAP_NODES = [
     "dht.libtorrent.org:25401"
 ]
 
-logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+LOG_LEVEL = os.environ.get("PKARR_LOG_LEVEL", "WARNING").upper()
 
 async def resolve(client: PkarrClient, public_key: PublicKey):
     start_time = time.time()
@@ -52,20 +50,20 @@ async def main():
     try:
         public_key = PublicKey(args.public_key)
     except PkarrError as e:
-        logging.error(f"Invalid public key: {e}")
+        logging.error("Invalid public key: %s", e)
         return
 
     keypair = Keypair.random()
-    client = PkarrClient(keypair, args.bootstrap)
+    async with PkarrClient(keypair, args.bootstrap) as client:
+        logging.info("Resolving Pkarr: %s", args.public_key)
+        logging.info("\n=== COLD LOOKUP ===")
+        await resolve(client, public_key)
 
-    logging.info(f"Resolving Pkarr: {args.public_key}")
-    logging.info("\n=== COLD LOOKUP ===")
-    await resolve(client, public_key)
+        await asyncio.sleep(1)
 
-    await asyncio.sleep(1)
-
-    logging.info("\n=== SUBSEQUENT LOOKUP ===")
-    await resolve(client, public_key)
+        logging.info("\n=== SUBSEQUENT LOOKUP ===")
+        await resolve(client, public_key)
 
 if __name__ == "__main__":
+    logging.basicConfig(level=LOG_LEVEL, format='%(asctime)s - %(levelname)s - %(message)s')
     asyncio.run(main())
\ No newline at end of file
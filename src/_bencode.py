@@ -0,0 +1,29 @@
+"""Bencode decoding: ``fastbencode``'s compiled decoder, with ``bencodepy`` as fallback.
+
+fastbencode rejects dictionaries whose keys are out of order, which some DHT
+implementations send; only those messages are retried with the lenient
+bencodepy. Every other fastbencode error is final.
+"""
+
+from bencodepy import decode as _decode_lenient
+
+try:
+    from fastbencode import bdecode as _bdecode
+except ImportError:
+    _bdecode = None
+
+_DISORDERED_KEYS = "dict keys disordered"
+
+
+def loads(data: bytes):
+    if _bdecode is None:
+        return _decode_lenient(data)
+    try:
+        return _bdecode(data)
+    except ValueError as e:
+        if str(e) != _DISORDERED_KEYS:
+            raise
+    return _decode_lenient(data)
+
+
+__all__ = ['loads']
@@ -0,0 +1,112 @@
+"""Batched UDP sends through Linux ``sendmmsg(2)`` via ctypes.
+
+Only IPv4 destinations given as dotted-quad addresses are supported; callers
+fall back to ``sendto`` for anything this module declines to send.
+"""
+
+import ctypes
+import ctypes.util
+import socket
+import sys
+from typing import List, Tuple
+
+MAX_BATCH = 100
+
+
+class _iovec(ctypes.Structure):
+    _fields_ = [
+        ("iov_base", ctypes.c_void_p),
+        ("iov_len", ctypes.c_size_t),
+    ]
+
+
+class _sockaddr_in(ctypes.Structure):
+    _fields_ = [
+        ("sin_family", ctypes.c_ushort),
+        ("sin_port", ctypes.c_uint16),
+        ("sin_addr", ctypes.c_ubyte * 4),
+        ("sin_zero", ctypes.c_ubyte * 8),
+    ]
+
+
+class _msghdr(ctypes.Structure):
+    _fields_ = [
+        ("msg_name", ctypes.c_void_p),
+        ("msg_namelen", ctypes.c_uint32),
+        ("msg_iov", ctypes.POINTER(_iovec)),
+        ("msg_iovlen", ctypes.c_size_t),
+        ("msg_control", ctypes.c_void_p),
+        ("msg_controllen", ctypes.c_size_t),
+        ("msg_flags", ctypes.c_int),
+    ]
+
+
+class _mmsghdr(ctypes.Structure):
+    _fields_ = [
+        ("msg_hdr", _msghdr),
+        ("msg_len", ctypes.c_uint),
+    ]
+
+
+def _load_sendmmsg():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        func = libc.sendmmsg
+    except (OSError, AttributeError):
+        return None
+    func.argtypes = [ctypes.c_int, ctypes.POINTER(_mmsghdr), ctypes.c_uint, ctypes.c_int]
+    func.restype = ctypes.c_int
+    return func
+
+
+_sendmmsg = _load_sendmmsg()
+
+
+def sendmmsg(fd: int, packets: List[Tuple[bytes, Tuple[str, int]]]) -> int:
+    """Send up to MAX_BATCH datagrams in one syscall.
+
+    Returns the number of leading packets that were sent. A return of 0 means
+    nothing was sent (unsupported platform, non-IPv4 address or a socket
+    error) and the caller should send the packets individually.
+    """
+    if _sendmmsg is None or not packets:
+        return 0
+
+    packets = packets[:MAX_BATCH]
+    count = len(packets)
+    msgs = (_mmsghdr * count)()
+    iovs = (_iovec * count)()
+    addrs = (_sockaddr_in * count)()
+    buffers = []
+
+    for i, (data, (host, port)) in enumerate(packets):
+        try:
+            packed_ip = socket.inet_aton(host)
+        except OSError:
+            # Leading packets up to the first hostname can still go in one batch.
+            count = i
+            break
+
+        buf = ctypes.create_string_buffer(data, len(data))
+        buffers.append(buf)
+
+        addrs[i].sin_family = socket.AF_INET
+        addrs[i].sin_port = socket.htons(port)
+        ctypes.memmove(addrs[i].sin_addr, packed_ip, 4)
+
+        iovs[i].iov_base = ctypes.cast(buf, ctypes.c_void_p)
+        iovs[i].iov_len = len(data)
+
+        hdr = msgs[i].msg_hdr
+        hdr.msg_name = ctypes.cast(ctypes.pointer(addrs[i]), ctypes.c_void_p)
+        hdr.msg_namelen = ctypes.sizeof(_sockaddr_in)
+        hdr.msg_iov = ctypes.pointer(iovs[i])
+        hdr.msg_iovlen = 1
+
+    if count == 0:
+        return 0
+
+    sent = _sendmmsg(fd, msgs, count, 0)
+    return max(sent, 0)
@@ -1,127 +1,282 @@
 import asyncio
+import collections
+import heapq
+import itertools
 import random
-from typing import List, Optional, Union
+from typing import Dict, List, Optional, Union
 from .signed_packet import SignedPacket
 from .keypair import Keypair
 from .public_key import PublicKey
 from .resource_record import ResourceRecord
 from .packet import Packet
 from .errors import PkarrError
+from .krpc import KrpcProtocol
 import logging
 import socket
 import struct
 import hashlib
-import bencodepy
-import json
 import time
 
-logging.basicConfig(level=logging.DEBUG)
+log = logging.getLogger(__name__)
+
+DEFAULT_MINIMUM_TTL = 300  # 5 minutes
+DEFAULT_MAXIMUM_TTL = 24 * 60 * 60  # 24 hours
+DEFAULT_CACHE_SIZE = 4096
+QUERY_TIMEOUT = 5  # seconds to wait for a single node to answer
+MAX_CONCURRENT_QUERIES = 16
+
+# Sorts after every real XOR distance, which is below 2**160
+_UNKNOWN_DISTANCE = 1 << 160
+
+# Compact node info: 20-byte node ID, 4-byte IPv4 address, 2-byte port
+_NODE_STRUCT = struct.Struct("!20s4sH")
+
+class Node(collections.namedtuple('Node', 'host port sockaddr node_id', defaults=(None,))):
+    """A DHT node, parsed once; sockaddr is what gets passed to sendto.
+
+    node_id is the 20-byte Kademlia ID from compact node info, or None for
+    bootstrap nodes whose ID we don't know.
+    """
+
+    __slots__ = ()
+
+    def __str__(self):
+        return f"{self.host}:{self.port}"
+
+def _parse_node(node: str) -> Node:
+    """Parse a "host:port" or "id@host:port" node string."""
+    if '@' in node:
+        _, node = node.split('@')
+    host, port = node.rsplit(':', 1)
+    port = int(port)
+    return Node(host, port, (host, port))
+
+def _identity(value):
+    return value
+
+def _decode_bytes(value: bytes) -> str:
+    # Almost every KRPC string is ASCII; skip the exception path for those
+    if value.isascii():
+        return value.decode('ascii')
+    try:
+        return value.decode('utf-8')
+    except UnicodeDecodeError:
+        return value.hex()
+
+def _decode_dict(value: dict) -> dict:
+    return {key.decode('utf-8'): _DISPATCH.get(type(item), _identity)(item) for key, item in value.items()}
+
+def _decode_list(value: list) -> list:
+    # List entries are compact binary (peers, nodes), so bytes are always shown as hex
+    return [_LIST_DISPATCH.get(type(item), _identity)(item) for item in value]
+
+# bencodepy decodes nested dictionaries as OrderedDict
+_DISPATCH = {bytes: _decode_bytes, dict: _decode_dict, collections.OrderedDict: _decode_dict, list: _decode_list}
+_LIST_DISPATCH = {bytes: bytes.hex, dict: _decode_dict, collections.OrderedDict: _decode_dict, list: _decode_list}
 
 class PkarrClient:
     def __init__(self, keypair: Keypair, bootstrap_nodes: List[str]):
         self.keypair = keypair
-        self.bootstrap_nodes = bootstrap_nodes
-        self.known_nodes = set(bootstrap_nodes)
+        self.bootstrap_nodes = [_parse_node(node) for node in bootstrap_nodes]
+        self.known_nodes = set(self.bootstrap_nodes)
+        # Parsed bootstrap node -> same node with a resolved IPv4 sockaddr
+        self._bootstrap_addrs: Dict[Node, Node] = {}
+        # Our 20-byte DHT node ID
+        self._node_id = hashlib.sha1(self.keypair.public_key.to_bytes()).digest()
+        # get_peers query as bencode with sorted keys, split around the two
+        # per-query fields:
+        #   {'a': {'id': node_id, 'info_hash': ...}, 'q': 'get_peers', 't': ..., 'y': 'q'}
+        self._query_prefix = b"d1:ad2:id20:" + self._node_id + b"9:info_hash20:"
+        self._query_mid = b"e1:q9:get_peers1:t2:"
+        self._query_suffix = b"1:y1:qe"
+        self._protocol: Optional[KrpcProtocol] = None
+        # Sequential transaction IDs never collide among in-flight queries
+        self._tid_counter = itertools.count(random.randrange(1 << 16))
+        self._protocol_lock = asyncio.Lock()
+        self.cache = collections.OrderedDict()
+        self.cache_max = DEFAULT_CACHE_SIZE
+
+    async def _ensure_protocol(self) -> KrpcProtocol:
+        """Bind the shared UDP endpoint on first use."""
+        if self._protocol is not None and self._protocol.transport is not None:
+            return self._protocol
+        # Concurrent lookups must not each bind (and leak) their own socket
+        async with self._protocol_lock:
+            if self._protocol is None or self._protocol.transport is None:
+                loop = asyncio.get_running_loop()
+                _, self._protocol = await loop.create_datagram_endpoint(KrpcProtocol, local_addr=('0.0.0.0', 0))
+        return self._protocol
+
+    async def _resolve_bootstrap_nodes(self) -> List[Node]:
+        """Resolve bootstrap hostnames to IPv4 addresses once, instead of on every send.
+
+        Hosts that fail to resolve are retried on the next lookup. Returns the
+        bootstrap nodes resolved so far.
+        """
+        pending = [node for node in self.bootstrap_nodes if node not in self._bootstrap_addrs]
+        if pending:
+            loop = asyncio.get_running_loop()
+            results = await asyncio.gather(
+                *(loop.getaddrinfo(node.host, node.port, family=socket.AF_INET, type=socket.SOCK_DGRAM) for node in pending),
+                return_exceptions=True
+            )
+            for node, infos in zip(pending, results):
+                if isinstance(infos, OSError):
+                    log.warning("Could not resolve bootstrap node %s: %s", node, infos)
+                    continue
+                if isinstance(infos, BaseException):
+                    raise infos
+                resolved = node._replace(sockaddr=infos[0][4])
+                self._bootstrap_addrs[node] = resolved
+                self.known_nodes.discard(node)
+                self.known_nodes.add(resolved)
+            if not self._bootstrap_addrs:
+                log.warning("No bootstrap node could be resolved")
+        return list(self._bootstrap_addrs.values())
+
+    async def aclose(self) -> None:
+        """Close the UDP endpoint."""
+        if self._protocol is not None:
+            self._protocol.close()
+            self._protocol = None
+
+    async def __aenter__(self) -> 'PkarrClient':
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+
+    def _cache_get(self, key: str) -> Optional[SignedPacket]:
+        """Return a fresh cached packet, refreshing its LRU position, or None."""
+        entry = self.cache.get(key)
+        if entry is None:
+            return None
+        packet, expiration_time = entry
+        now = time.monotonic()
+        if now >= expiration_time:
+            del self.cache[key]
+            return None
+        self.cache.move_to_end(key)
+        log.debug("Have fresh signed_packet in cache. expires_in=%d", expiration_time - now)
+        return packet
+
+    def _cache_put(self, key: str, packet: SignedPacket, expiration_time: float) -> None:
+        """Insert a packet, evicting the least recently used entry when full."""
+        self.cache[key] = (packet, expiration_time)
+        self.cache.move_to_end(key)
+        if len(self.cache) > self.cache_max:
+            self.cache.popitem(last=False)
 
     async def lookup(self, public_key: str, max_attempts: int = 100, timeout: int = 30) -> Optional[SignedPacket]:
         """Look up records from the DHT."""
         target_key = PublicKey(public_key)
         
         # Check cache first
-        cached_packet, expiration_time = self.cache.get(public_key, (None, 0))
-        if cached_packet and time.time() < expiration_time:
-            logging.debug(f"Have fresh signed_packet in cache. expires_in={int(expiration_time - time.time())}")
+        cached_packet = self._cache_get(public_key)
+        if cached_packet:
             return cached_packet
 
-        nodes_to_query = set(self.bootstrap_nodes)
+        await self._ensure_protocol()
+        bootstrap_nodes = await self._resolve_bootstrap_nodes()
+
+        # Best-first frontier ordered by XOR distance to the target (Kademlia)
+        target = int.from_bytes(target_key.info_hash(), 'big')
+        tiebreak = itertools.count()
+        nodes_to_query = []
+        seen_nodes = set()
         queried_nodes = set()
+        in_flight = {}
+
+        def enqueue(nodes):
+            added = 0
+            for node in nodes:
+                # Dedup by address: the same node may come back under another ID
+                if node.sockaddr in seen_nodes:
+                    continue
+                seen_nodes.add(node.sockaddr)
+                distance = _UNKNOWN_DISTANCE if node.node_id is None else int.from_bytes(node.node_id, 'big') ^ target
+                heapq.heappush(nodes_to_query, (distance, next(tiebreak), node))
+                added += 1
+            return added
+
+        enqueue(bootstrap_nodes)
         
-        start_time = time.time()
+        loop_time = asyncio.get_running_loop().time
+        start_time = loop_time()
+        deadline = start_time + timeout
         attempts = 0
 
-        while nodes_to_query and attempts < max_attempts and (time.time() - start_time) < timeout:
-            node = nodes_to_query.pop()
-            queried_nodes.add(node)
-            attempts += 1
-            
-            logging.info(f"Attempt {attempts}: Querying node {node}")
-            
-            try:
-                result = await self._request_packet(node, target_key)
-                if isinstance(result, SignedPacket):
-                    logging.info(f"Found result after {attempts} attempts and {time.time() - start_time:.2f} seconds")
-                    # Cache the result
-                    self.cache[public_key] = (result, time.time() + result.ttl(DEFAULT_MINIMUM_TTL, DEFAULT_MAXIMUM_TTL))
-                    return result
-                elif result:
-                    new_nodes = set(result) - queried_nodes
-                    nodes_to_query.update(new_nodes)
-                    logging.info(f"Added {len(new_nodes)} new nodes to query. Total known nodes: {len(self.known_nodes)}")
-            except PkarrError as e:
-                logging.error(f"Error with node {node}: {e}")
+        try:
+            while (nodes_to_query or in_flight) and loop_time() < deadline:
+                # Keep the window full: start a new query as soon as any slot frees up
+                while nodes_to_query and attempts < max_attempts and len(in_flight) < MAX_CONCURRENT_QUERIES:
+                    _, _, node = heapq.heappop(nodes_to_query)
+                    queried_nodes.add(node.sockaddr)
+                    attempts += 1
+                    log.info("Attempt %d: Querying node %s", attempts, node)
+                    in_flight[asyncio.create_task(self._request_packet(node, target_key))] = node
+
+                if not in_flight:
+                    break
+
+                done, _ = await asyncio.wait(
+                    in_flight,
+                    timeout=deadline - loop_time(),
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+
+                for task in done:
+                    node = in_flight.pop(task)
+                    try:
+                        result = task.result()
+                    except PkarrError as e:
+                        log.error("Error with node %s: %s", node, e)
+                        continue
+
+                    if isinstance(result, SignedPacket):
+                        log.info("Found result after %d attempts and %.2f seconds", attempts, loop_time() - start_time)
+                        # Cache the result
+                        self._cache_put(public_key, result, time.monotonic() + result.ttl(DEFAULT_MINIMUM_TTL, DEFAULT_MAXIMUM_TTL))
+                        return result
+                    elif result:
+                        added = enqueue(result)
+                        log.info("Added %d new nodes to query. Total known nodes: %d", added, len(self.known_nodes))
+        finally:
+            for task in in_flight:
+                task.cancel()
         
-        logging.info(f"Lookup completed after {attempts} attempts and {time.time() - start_time:.2f} seconds")
-        logging.info(f"Queried {len(queried_nodes)} unique nodes")
+        log.info("Lookup completed after %d attempts and %.2f seconds", attempts, loop_time() - start_time)
+        log.info("Queried %d unique nodes", len(queried_nodes))
         
         if attempts >= max_attempts:
-            logging.warning("Lookup terminated: maximum attempts reached")
-        elif (time.time() - start_time) >= timeout:
-            logging.warning("Lookup terminated: timeout reached")
+            log.warning("Lookup terminated: maximum attempts reached")
+        elif loop_time() >= deadline:
+            log.warning("Lookup terminated: timeout reached")
         else:
-            logging.warning("Lookup terminated: no more nodes to query")
+            log.warning("Lookup terminated: no more nodes to query")
         
         return None
 
-    async def _request_packet(self, node: str, target_key: PublicKey, record_type: str) -> Optional[Union[SignedPacket, List[str]]]:
+    async def _request_packet(self, node: Node, target_key: PublicKey, record_type: Optional[str] = None) -> Optional[Union[SignedPacket, List[Node]]]:
         """Request a packet from a node."""
-        logging.info(f"Requesting packet from node {node} for key {target_key.to_z32()} and record_type {record_type}")
+        log.info("Requesting packet from node %s for key %s and record_type %s", node, target_key, record_type)
         
         try:
-            # Extract IP and port from the node string
-            if '@' in node:
-                _, ip_port = node.split('@')
-            else:
-                ip_port = node
-            
-            host, port = ip_port.split(':')
-            port = int(port)
-
-            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            sock.settimeout(5)  # Set a 5-second timeout
-
-            # Ensure we have a 20-byte node ID
-            node_id = hashlib.sha1(self.keypair.public_key.to_bytes()).digest()
-
-            # Ensure we have a 20-byte info_hash
-            info_hash = hashlib.sha1(target_key.to_bytes()).digest()
-
             # Prepare and send the DHT query
-            transaction_id = random.randint(0, 65535).to_bytes(2, 'big')
-            message = bencodepy.encode({
-                't': transaction_id,
-                'y': 'q',
-                'q': 'get_peers',
-                'a': {
-                    'id': node_id,
-                    'info_hash': info_hash
-                }
-            })
-
-            logging.debug(f"Sending message to {host}:{port}: {message}")
-            sock.sendto(message, (host, port))
-
-            # Wait for the response
-            data, addr = sock.recvfrom(1024)
-            logging.debug(f"Received raw response from {addr}: {data}")
-            
-            # Parse the response
-            response = bencodepy.decode(data)
-            human_readable = self._decode_response(response)
-            logging.info(f"Decoded response from {addr}:\n{json.dumps(human_readable, indent=2)}")
+            transaction_id = (next(self._tid_counter) & 0xFFFF).to_bytes(2, 'big')
+            message = self._query_prefix + target_key.info_hash() + self._query_mid + transaction_id + self._query_suffix
+
+            log.debug("Sending message to %s: %r", node, message)
+            protocol = await self._ensure_protocol()
+            response, addr = await protocol.request(message, transaction_id, node.sockaddr, QUERY_TIMEOUT)
+            if log.isEnabledFor(logging.INFO):
+                log.info("Received response from %s: keys=%s", addr, list(response))
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("Decoded response from %s: %r", addr, self._decode_response(response))
             
             if response.get(b'y') == b'e':
                 error_code, error_message = response.get(b'e', [None, b''])[0], response.get(b'e', [None, b''])[1].decode('utf-8', errors='ignore')
-                logging.error(f"Received error response: Code {error_code}, Message: {error_message}")
+                log.error("Received error response: Code %s, Message: %s", error_code, error_message)
                 return None
             
             # Check if the response contains the data we need
@@ -130,25 +285,23 @@ class PkarrClient:
                 if b'values' in r:
                     # Process peer values
                     peer_values = r[b'values']
-                    logging.info(f"Found {len(peer_values)} peer values")
+                    log.info("Found %d peer values", len(peer_values))
                     return await self._connect_to_peers(peer_values, target_key, record_type)
                 elif b'nodes' in r:
                     # Process nodes for further querying
                     nodes = r[b'nodes']
                     decoded_nodes = self._decode_nodes(nodes)
-                    logging.info(f"Found {len(decoded_nodes)} nodes")
+                    log.info("Found %d nodes", len(decoded_nodes))
                     self._update_known_nodes(decoded_nodes)
                     return decoded_nodes
             
             return None
 
-        except socket.timeout:
-            logging.error(f"Timeout while connecting to {host}:{port}")
+        except asyncio.TimeoutError:
+            log.error("Timeout while querying %s", node)
         except Exception as e:
-            logging.error(f"Error requesting packet from {host}:{port}: {e}")
-            logging.exception("Exception details:")
-        finally:
-            sock.close()
+            log.error("Error requesting packet from %s: %s", node, e)
+            log.exception("Exception details:")
 
         return None
 
@@ -160,56 +313,43 @@ class PkarrClient:
                 port = struct.unpack("!H", peer_value[4:])[0]
                 peer = f"{ip}:{port}"
                 
-                logging.info(f"Connecting to peer {peer}")
+                log.info("Connecting to peer %s", peer)
                 
                 # Here you would implement the logic to connect to the peer and retrieve the SignedPacket
                 # For now, we'll just return a dummy SignedPacket
                 return SignedPacket(target_key, b"dummy_signature", Packet())
             
             except Exception as e:
-                logging.error(f"Error connecting to peer {peer}: {e}")
+                log.error("Error connecting to peer %s: %s", peer, e)
         
         return None
 
 
     def _decode_response(self, response: dict[bytes, any]) -> dict[str, any]:
         """Decode the bencoded response into a human-readable format."""
-        decoded = {}
-        for key, value in response.items():
-            str_key = key.decode('utf-8')
-            if isinstance(value, bytes):
-                try:
-                    decoded[str_key] = value.decode('utf-8')
-                except UnicodeDecodeError:
-                    decoded[str_key] = value.hex()
-            elif isinstance(value, dict):
-                decoded[str_key] = self._decode_response(value)
-            elif isinstance(value, list):
-                decoded[str_key] = [self._decode_response(item) if isinstance(item, dict) else item.hex() if isinstance(item, bytes) else item for item in value]
-            else:
-                decoded[str_key] = value
+        decoded = _decode_dict(response)
 
         if 'r' in decoded and 'nodes' in decoded['r']:
-            decoded['r']['decoded_nodes'] = self._decode_nodes(response[b'r'][b'nodes'])
+            decoded['r']['decoded_nodes'] = [str(node) for node in self._decode_nodes(response[b'r'][b'nodes'])]
 
         return decoded
 
-    def _decode_nodes(self, nodes_data: bytes) -> List[str]:
+    def _decode_nodes(self, nodes_data: bytes) -> List[Node]:
         """Decode the compact node info."""
+        # Ignore a trailing partial entry rather than failing the whole response
+        usable = len(nodes_data) - len(nodes_data) % _NODE_STRUCT.size
         nodes = []
-        for i in range(0, len(nodes_data), 26):
-            node_id = nodes_data[i:i+20].hex()
-            ip = socket.inet_ntoa(nodes_data[i+20:i+24])
-            port = struct.unpack("!H", nodes_data[i+24:i+26])[0]
-            nodes.append(f"{ip}:{port}")
+        for node_id, ip, port in _NODE_STRUCT.iter_unpack(nodes_data[:usable]):
+            host = socket.inet_ntoa(ip)
+            nodes.append(Node(host, port, (host, port), node_id))
         return nodes
 
-    def _update_known_nodes(self, new_nodes: List[str]) -> None:
+    def _update_known_nodes(self, new_nodes: List[Node]) -> None:
         """Update the list of known nodes."""
         self.known_nodes.update(new_nodes)
-        logging.info(f"Updated known nodes. Total known nodes: {len(self.known_nodes)}")
+        log.info("Updated known nodes. Total known nodes: %d", len(self.known_nodes))
 
-    async def _send_packet(self, node: str, signed_packet: SignedPacket) -> None:
+    async def _send_packet(self, node: Node, signed_packet: SignedPacket) -> None:
         """Send a signed packet to a node."""
         # Implement UDP packet sending logic here
         pass
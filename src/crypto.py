@@ -1,36 +1,87 @@
 import os
 import hashlib
-import ed25519
+import threading
+from collections import OrderedDict
+from nacl.bindings import crypto_sign_open
+from nacl.signing import SigningKey
+from nacl.exceptions import BadSignatureError
+
+# Ed25519 group order L and field prime p
+_L = 2**252 + 27742317777372353535851937790883648493
+_P = 2**255 - 19
+_Y_MASK = (1 << 255) - 1
+
+# (public_key, sha256(message), signature) -> bool, shared across all callers so
+# a SignedPacket rebroadcast by many peers is only verified once.
+_VERIFY_CACHE = OrderedDict()
+_VERIFY_CACHE_SIZE = 4096
+_VERIFY_CACHE_LOCK = threading.Lock()
+
+_Z32_ALPHABET = b"ybndrfg8ejkmcpqxot1uwisza345h769"
+# Every 10-bit value as its two z-base-32 characters
+_Z32_PAIRS = [bytes((_Z32_ALPHABET[i >> 5], _Z32_ALPHABET[i & 31])) for i in range(1024)]
+_BASE32_DIGITS = b"0123456789abcdefghijklmnopqrstuv"
+
+# Translation table from z-base-32 to int(..., 32) digits. Anything outside the
+# alphabet maps to '!', which int() rejects with ValueError.
+_Z32_TO_BASE32 = bytearray(b"!" * 256)
+for _i, _c in enumerate(_Z32_ALPHABET):
+    _Z32_TO_BASE32[_c] = _BASE32_DIGITS[_i]
+_Z32_TO_BASE32 = bytes(_Z32_TO_BASE32)
+
+def _is_canonical(public_key, signature) -> bool:
+    """Check S < L and that R and A are canonical point encodings (y < p)."""
+    if int.from_bytes(signature[32:], 'little') >= _L:
+        return False
+    if int.from_bytes(signature[:32], 'little') & _Y_MASK >= _P:
+        return False
+    return int.from_bytes(public_key, 'little') & _Y_MASK < _P
 
 class Crypto:
     @staticmethod
     def generate_keypair():
-        private_key, public_key = ed25519.create_keypair()
-        return private_key.to_bytes()[:32], public_key.to_bytes()
+        signing_key = SigningKey.generate()
+        return bytes(signing_key), bytes(signing_key.verify_key)
 
     @staticmethod
     def derive_public_key(secret_key):
         if len(secret_key) != 32:
             raise ValueError("Secret key must be 32 bytes long")
-        signing_key = ed25519.SigningKey(secret_key)
-        return signing_key.get_verifying_key().to_bytes()
+        return bytes(SigningKey(secret_key).verify_key)
 
     @staticmethod
     def sign(secret_key, message):
         if len(secret_key) != 32:
             raise ValueError("Secret key must be 32 bytes long")
-        signing_key = ed25519.SigningKey(secret_key)
-        return signing_key.sign(message)
+        return SigningKey(secret_key).sign(message).signature
 
     @staticmethod
     def verify(public_key, message, signature):
-        verifying_key = ed25519.VerifyingKey(public_key)
-        try:
-            verifying_key.verify(signature, message)
-            return True
-        except ed25519.BadSignatureError:
+        # Reject malformed or malleable encodings with integer compares before
+        # paying for hashing or a scalar multiplication.
+        if len(signature) != 64 or not _is_canonical(public_key, signature):
             return False
 
+        cache_key = (bytes(public_key), Crypto.hash(message), bytes(signature))
+        with _VERIFY_CACHE_LOCK:
+            result = _VERIFY_CACHE.get(cache_key)
+            if result is not None:
+                _VERIFY_CACHE.move_to_end(cache_key)
+                return result
+
+        try:
+            # Raw binding: no VerifyKey/SignedMessage wrappers per call
+            crypto_sign_open(bytes(signature) + bytes(message), bytes(public_key))
+            result = True
+        except BadSignatureError:
+            result = False
+
+        with _VERIFY_CACHE_LOCK:
+            _VERIFY_CACHE[cache_key] = result
+            if len(_VERIFY_CACHE) > _VERIFY_CACHE_SIZE:
+                _VERIFY_CACHE.popitem(last=False)
+        return result
+
     @staticmethod
     def hash(data):
         return hashlib.sha256(data).digest()
@@ -41,31 +92,34 @@ class Crypto:
 
     @staticmethod
     def z_base_32_encode(data):
-        alphabet = "ybndrfg8ejkmcpqxot1uwisza345h769"
-        result = ""
-        bits = 0
-        value = 0
-        for byte in data:
-            value = (value << 8) | byte
-            bits += 8
-            while bits >= 5:
-                bits -= 5
-                result += alphabet[(value >> bits) & 31]
-        if bits > 0:
-            result += alphabet[(value << (5 - bits)) & 31]
-        return result
+        # Every 5 bytes are exactly 8 characters: take each group as a 40-bit
+        # int and emit it as four 10-bit character pairs.
+        size = len(data)
+        full = size - size % 5
+        parts = []
+        for i in range(0, full, 5):
+            group = int.from_bytes(data[i:i + 5], 'big')
+            parts += (
+                _Z32_PAIRS[group >> 30],
+                _Z32_PAIRS[(group >> 20) & 0x3FF],
+                _Z32_PAIRS[(group >> 10) & 0x3FF],
+                _Z32_PAIRS[group & 0x3FF],
+            )
+        rest = size - full
+        if rest:
+            # Final partial group, zero-padded to a multiple of 5 bits
+            nchars = (rest * 8 + 4) // 5
+            group = int.from_bytes(data[full:], 'big') << (nchars * 5 - rest * 8)
+            parts.append(bytes(_Z32_ALPHABET[(group >> shift) & 31] for shift in range((nchars - 1) * 5, -1, -5)))
+        return b"".join(parts).decode('ascii')
 
     @staticmethod
     def z_base_32_decode(encoded):
-        alphabet = "ybndrfg8ejkmcpqxot1uwisza345h769"
-        alphabet_map = {char: index for index, char in enumerate(alphabet)}
-        result = bytearray()
-        bits = 0
-        value = 0
-        for char in encoded:
-            value = (value << 5) | alphabet_map[char]
-            bits += 5
-            if bits >= 8:
-                bits -= 8
-                result.append((value >> bits) & 255)
-        return bytes(result)
\ No newline at end of file
+        if not encoded:
+            return b""
+        # Map to standard base-32 digits and let int() do the accumulation
+        digits = encoded.encode('ascii').translate(_Z32_TO_BASE32)
+        value = int(digits, 32)
+        nbits = len(digits) * 5
+        nbytes = nbits // 8
+        return (value >> (nbits - nbytes * 8)).to_bytes(nbytes, 'big')
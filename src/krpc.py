@@ -0,0 +1,111 @@
+import asyncio
+import logging
+import socket
+from typing import Any, Dict, List, Optional, Tuple
+from . import _bencode as bencode
+from . import _sendmmsg
+from .errors import DHTIsShutdown
+
+log = logging.getLogger(__name__)
+
+Address = Tuple[str, int]
+
+UDP_BUFFER_SIZE = 2 * 1024 * 1024
+
+
+class KrpcProtocol(asyncio.DatagramProtocol):
+    """Single UDP endpoint multiplexing KRPC queries by transaction id."""
+
+    def __init__(self):
+        self.transport: Optional[asyncio.DatagramTransport] = None
+        # transaction id -> (future, address the query was sent to)
+        self._pending: Dict[bytes, Tuple[asyncio.Future, Address]] = {}
+        self._outbox: List[Tuple[bytes, Address]] = []
+        self._flush_scheduled = False
+
+    def connection_made(self, transport: asyncio.DatagramTransport) -> None:
+        self.transport = transport
+        sock = transport.get_extra_info('socket')
+        if sock is not None:
+            # Bursty fan-out overflows the default ~200 KB buffers and drops replies.
+            for option in (socket.SO_RCVBUF, socket.SO_SNDBUF):
+                try:
+                    sock.setsockopt(socket.SOL_SOCKET, option, UDP_BUFFER_SIZE)
+                except OSError as e:
+                    log.debug("Could not resize UDP buffer: %s", e)
+
+    def datagram_received(self, data: bytes, addr: Address) -> None:
+        try:
+            response = bencode.loads(data)
+        except Exception as e:
+            log.debug("Dropping undecodable datagram from %s: %s", addr, e)
+            return
+
+        if not isinstance(response, dict):
+            return
+
+        transaction_id = response.get(b't')
+        if not isinstance(transaction_id, bytes):
+            return
+        entry = self._pending.get(transaction_id)
+        if entry is None:
+            return
+        future, expected_addr = entry
+        # Transaction ids are guessable; only the queried node may answer
+        if tuple(addr[:2]) != tuple(expected_addr[:2]):
+            log.debug("Dropping reply from %s for a query sent to %s", addr, expected_addr)
+            return
+        del self._pending[transaction_id]
+        if not future.done():
+            future.set_result((response, addr))
+
+    def error_received(self, exc: Exception) -> None:
+        log.debug("UDP error received: %s", exc)
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        self.transport = None
+        for future, _ in self._pending.values():
+            if not future.done():
+                future.set_exception(exc or DHTIsShutdown())
+        self._pending.clear()
+
+    def send(self, data: bytes, addr: Address) -> None:
+        """Queue a datagram; queued datagrams are flushed together on the next loop tick."""
+        self._outbox.append((data, addr))
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self._flush)
+
+    def _flush(self) -> None:
+        self._flush_scheduled = False
+        outbox, self._outbox = self._outbox, []
+        if self.transport is None:
+            return
+
+        sock = self.transport.get_extra_info('socket')
+        i = 0
+        while i < len(outbox):
+            sent = _sendmmsg.sendmmsg(sock.fileno(), outbox[i:i + _sendmmsg.MAX_BATCH]) if sock else 0
+            if sent == 0:
+                self.transport.sendto(*outbox[i])
+                sent = 1
+            i += sent
+
+    async def request(self, message: bytes, transaction_id: bytes, addr: Address, timeout: float) -> Tuple[Dict[bytes, Any], Address]:
+        """Send a query and wait for the response carrying the same transaction id."""
+        if self.transport is None:
+            raise DHTIsShutdown()
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[transaction_id] = (future, addr)
+        self.send(message, addr)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            entry = self._pending.get(transaction_id)
+            if entry is not None and entry[0] is future:
+                del self._pending[transaction_id]
+
+    def close(self) -> None:
+        if self.transport is not None:
+            self.transport.close()
@@ -1,12 +1,304 @@
+import functools
+import ipaddress
+import operator
+import re
+import struct
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import Dict, Optional, Tuple
 from dns import message, name, rdata, rdatatype, rdataclass
 from .resource_record import ResourceRecord
 from .errors import PacketError
 
-@dataclass
+# Record types and classes handled by the direct wire codec; anything else
+# goes through dnspython.
+_RTYPE = {'A': 1, 'NS': 2, 'CNAME': 5, 'MX': 15, 'TXT': 16, 'AAAA': 28, 'SRV': 33}
+_RTYPE_NAMES = {v: k for k, v in _RTYPE.items()}
+# Only IN: the rdata layouts here are the IN ones, and other classes differ (CH A)
+_RCLASS = {'IN': 1}
+
+_ttl_getter = operator.attrgetter('ttl')
+
+_HEADER = struct.Struct("!HHHHHH")
+_RR_FIXED = struct.Struct("!HHIH")
+_U16 = struct.Struct("!H")
+
+# Tokens are whitespace-separated and cannot overlap, so matching stays linear
+_TXT_RDATA = re.compile(r'\s*(?:"[^"\\]*"|[^\s"\\]+)(?:\s+(?:"[^"\\]*"|[^\s"\\]+))*\s*')
+_TXT_STRING = re.compile(r'"([^"\\]*)"|([^\s"\\]+)')
+
+
+class _Unsupported(Exception):
+    """Raised by the direct wire codec for input it leaves to dnspython."""
+
+
+def _encode_name(domain: str, buf: bytearray, compress: Optional[Dict[str, int]]) -> None:
+    """Append a wire-format name to buf, reusing earlier suffixes via compression pointers."""
+    if '\\' in domain:
+        raise _Unsupported()
+    if domain.endswith('.'):
+        domain = domain[:-1]
+    labels = domain.split('.') if domain else []
+
+    wire_length = 1
+    for i, label in enumerate(labels):
+        if compress is not None:
+            suffix = '.'.join(labels[i:]).lower()
+            pointer = compress.get(suffix)
+            if pointer is not None:
+                buf += _U16.pack(0xC000 | pointer)
+                return
+            if len(buf) <= 0x3FFF:
+                compress[suffix] = len(buf)
+        try:
+            encoded = label.encode('ascii')
+        except UnicodeEncodeError:
+            raise _Unsupported()
+        if not 0 < len(encoded) < 64:
+            raise _Unsupported()
+        wire_length += len(encoded) + 1
+        if wire_length > 255:
+            raise _Unsupported()
+        buf.append(len(encoded))
+        buf += encoded
+    buf.append(0)
+
+
+def _encode_rdata(rtype: str, value, buf: bytearray, compress: Dict[str, int]) -> None:
+    """Append the rdata of a record to buf."""
+    if rtype == 'A':
+        buf += ipaddress.IPv4Address(value).packed
+    elif rtype == 'AAAA':
+        buf += ipaddress.IPv6Address(value).packed
+    elif rtype in ('CNAME', 'NS'):
+        _encode_name(value, buf, compress)
+    elif rtype == 'MX':
+        preference, exchange = value.split()
+        buf += _U16.pack(int(preference))
+        _encode_name(exchange, buf, compress)
+    elif rtype == 'SRV':
+        priority, weight, port, target = value.split()
+        buf += struct.pack("!HHH", int(priority), int(weight), int(port))
+        # RFC 2782: the SRV target must not be compressed
+        _encode_name(target, buf, None)
+    elif rtype == 'TXT':
+        if not _TXT_RDATA.fullmatch(value):
+            raise _Unsupported()
+        for quoted, bare in _TXT_STRING.findall(value):
+            try:
+                encoded = (quoted or bare).encode('ascii')
+            except UnicodeEncodeError:
+                raise _Unsupported()
+            if len(encoded) > 255:
+                raise _Unsupported()
+            buf.append(len(encoded))
+            buf += encoded
+    else:
+        raise _Unsupported()
+
+
+# Label bytes the direct decoder renders verbatim; dnspython would escape the rest.
+_SAFE_LABEL = frozenset(b"abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-_*")
+_SRV_FIXED = struct.Struct("!HHH")
+# Record types whose rdata is or ends in a domain name
+_NAME_RDATA = frozenset(('CNAME', 'NS', 'MX', 'SRV'))
+
+
+def _decode_name(data: bytes, offset: int):
+    """Return (absolute name text, offset past the name), following compression pointers."""
+    labels = []
+    end = None
+    limit = offset
+    wire_length = 1
+    while True:
+        size = data[offset]
+        if size & 0xC0 == 0xC0:
+            pointer = ((size & 0x3F) << 8) | data[offset + 1]
+            if end is None:
+                end = offset + 2
+            # Only backward pointers: rules out loops
+            if pointer >= limit:
+                raise _Unsupported()
+            offset = limit = pointer
+            continue
+        if size & 0xC0:
+            raise _Unsupported()
+        offset += 1
+        if size == 0:
+            break
+        label = data[offset:offset + size]
+        wire_length += size + 1
+        if len(label) != size or wire_length > 255 or not _SAFE_LABEL.issuperset(label):
+            raise _Unsupported()
+        labels.append(label.decode('ascii'))
+        offset += size
+    return '.'.join(labels) + '.', offset if end is None else end
+
+
+def _escape_txt(value: bytes) -> str:
+    """Quote a TXT character-string the way dnspython renders it."""
+    out = []
+    for c in value:
+        if c == 0x22 or c == 0x5C:
+            out.append('\\' + chr(c))
+        elif 0x20 <= c < 0x7F:
+            out.append(chr(c))
+        else:
+            out.append('\\%03d' % c)
+    return '"' + ''.join(out) + '"'
+
+
+def _decode_rdata(rtype: str, data: bytes, offset: int, end: int):
+    """Decode the rdata of a record into the value ResourceRecord expects."""
+    if rtype == 'A':
+        if end - offset != 4:
+            raise _Unsupported()
+        return data[offset:end]
+    if rtype == 'AAAA':
+        if end - offset != 16:
+            raise _Unsupported()
+        return data[offset:end]
+    if rtype in ('CNAME', 'NS'):
+        text, offset = _decode_name(data, offset)
+    elif rtype == 'MX':
+        preference, = _U16.unpack_from(data, offset)
+        exchange, offset = _decode_name(data, offset + 2)
+        text = f"{preference} {exchange}"
+    elif rtype == 'SRV':
+        priority, weight, port = _SRV_FIXED.unpack_from(data, offset)
+        target, offset = _decode_name(data, offset + 6)
+        text = f"{priority} {weight} {port} {target}"
+    elif rtype == 'TXT':
+        if offset == end:
+            raise _Unsupported()
+        strings = []
+        while offset < end:
+            size = data[offset]
+            offset += 1 + size
+            strings.append(_escape_txt(data[offset - size:offset]))
+        text = ' '.join(strings)
+    else:
+        raise _Unsupported()
+    if offset != end:
+        raise _Unsupported()
+    return text
+
+
+def _parse_wire_direct(data: bytes):
+    """Decode the header and answer section without going through dnspython.
+
+    Covers what _build_wire produces; raises _Unsupported (or IndexError /
+    struct.error on truncated input) so the caller can let dnspython decide.
+    """
+    msg_id, flags, qdcount, ancount, nscount, arcount = _HEADER.unpack_from(data)
+    # Other opcodes (UPDATE) give the sections a different meaning
+    if nscount or arcount or flags & 0x7800:
+        raise _Unsupported()
+
+    offset = _HEADER.size
+    for _ in range(qdcount):
+        _, offset = _decode_name(data, offset)
+        offset += 4
+
+    # Records sharing owner and type form one RRset, as in dnspython: grouped in
+    # order of first appearance, duplicates dropped, the smallest TTL for all
+    rrsets = {}
+    for _ in range(ancount):
+        rr_name, offset = _decode_name(data, offset)
+        rtype, rclass, ttl, rdlength = _RR_FIXED.unpack_from(data, offset)
+        offset += _RR_FIXED.size
+        # RFC 2181 section 8: a TTL with the top bit set is treated as zero, as dnspython does
+        if ttl > 0x7FFFFFFF:
+            ttl = 0
+        end = offset + rdlength
+        rtype_name = _RTYPE_NAMES.get(rtype)
+        # The rdata layouts below are the IN ones; other classes can differ (CH A)
+        if rtype_name is None or rclass != _RCLASS['IN'] or end > len(data):
+            raise _Unsupported()
+        rdata = _decode_rdata(rtype_name, data, offset, end)
+        rrset = rrsets.setdefault((rr_name.lower(), rtype_name), [rr_name, ttl, {}])
+        rrset[1] = min(rrset[1], ttl)
+        # Names inside rdata compare case-insensitively; TXT and addresses don't
+        rrset[2].setdefault(rdata.lower() if rtype_name in _NAME_RDATA else rdata, rdata)
+        offset = end
+
+    if offset != len(data):
+        raise _Unsupported()
+
+    answers = tuple(
+        ResourceRecord(name=owner, rclass='IN', ttl=ttl, rtype=rtype, rdata=rdata)
+        for (_, rtype), (owner, ttl, rdatas) in rrsets.items()
+        for rdata in rdatas.values()
+    )
+
+    header = (
+        msg_id,
+        bool(flags & (1 << 15)),
+        (flags >> 11) & 0xF,
+        bool(flags & (1 << 10)),
+        bool(flags & (1 << 9)),
+        bool(flags & (1 << 8)),
+        bool(flags & (1 << 7)),
+        (flags >> 4) & 0x7,
+        flags & 0xF
+    )
+    return header, answers
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_wire(data: bytes):
+    """Parse DNS wire bytes into (header fields, answers).
+
+    Cached because the same signed payload is typically served by several
+    DHT peers. Callers must not mutate the returned records.
+    """
+    try:
+        return _parse_wire_direct(data)
+    except (_Unsupported, IndexError, struct.error):
+        return _parse_wire_dnspython(data)
+
+
+def _parse_wire_dnspython(data: bytes):
+    """Parse DNS wire bytes through dnspython; handles every record type it knows."""
+    try:
+        msg = message.from_wire(data)
+        header = (
+            msg.id,
+            bool(msg.flags & (1 << 15)),
+            (msg.flags >> 11) & 0xF,
+            bool(msg.flags & (1 << 10)),
+            bool(msg.flags & (1 << 9)),
+            bool(msg.flags & (1 << 8)),
+            bool(msg.flags & (1 << 7)),
+            (msg.flags >> 4) & 0x7,
+            msg.flags & 0xF
+        )
+
+        answers = []
+        for rrset in msg.answer:
+            for rr in rrset:
+                answers.append(ResourceRecord(
+                    name=rrset.name.to_text(),
+                    rclass=rdataclass.to_text(rr.rdclass),
+                    ttl=rrset.ttl,
+                    rtype=rdatatype.to_text(rr.rdtype),
+                    rdata=rr.to_text()
+                ))
+
+        return header, tuple(answers)
+    except Exception as e:
+        raise PacketError(f"Failed to parse packet: {str(e)}")
+
+
+# Packet attributes derived from the public fields; setting anything else
+# invalidates the memoized encoding
+_DERIVED = frozenset(('_by_name', '_encoded', '_min_ttl'))
+
+
+@dataclass(slots=True)
 class Packet:
-    answers: List[ResourceRecord] = field(default_factory=list)
+    # Stored as a tuple so it can only change through assignment or add_answer,
+    # both of which keep the index, minimum TTL and encoding in sync
+    answers: Tuple[ResourceRecord, ...] = ()
     id: int = 0
     qr: bool = True  # True for response, False for query
     opcode: int = 0  # 0 for standard query
@@ -16,40 +308,117 @@ class Packet:
     ra: bool = False  # Recursion Available
     z: int = 0  # Reserved for future use
     rcode: int = 0  # Response code
+    # Answers keyed by name without the trailing dot
+    _by_name: Dict[str, Tuple[ResourceRecord, ...]] = field(init=False, repr=False, compare=False)
+    # Wire encoding memoized by build_bytes_vec_compressed; cleared on any field change
+    _encoded: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
+    _min_ttl: Optional[int] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._rebuild()
+
+    def __setattr__(self, attr, value):
+        if attr == 'answers':
+            value = tuple(value)
+        object.__setattr__(self, attr, value)
+        if attr in _DERIVED:
+            return
+        object.__setattr__(self, '_encoded', None)
+        # During __init__ the index doesn't exist yet; __post_init__ builds it
+        if attr == 'answers' and hasattr(self, '_by_name'):
+            self._rebuild()
+
+    def _rebuild(self):
+        self._by_name = {}
+        for rr in self.answers:
+            self._index(rr)
+        self._min_ttl = min(map(_ttl_getter, self.answers)) if self.answers else None
+
+    def _index(self, answer: ResourceRecord):
+        key = answer.name[:-1] if answer.name.endswith('.') else answer.name
+        # Tuples, so callers of records_for can't alter the index
+        self._by_name[key] = self._by_name.get(key, ()) + (answer,)
 
     @classmethod
     def new_reply(cls, id: int):
-        return cls(answers=[], id=id)
+        return cls(answers=(), id=id)
 
     def add_answer(self, answer: ResourceRecord):
-        self.answers.append(answer)
+        # Extend in place of a full rebuild; the encoding is dropped all the same
+        object.__setattr__(self, 'answers', self.answers + (answer,))
+        self._index(answer)
+        self._encoded = None
+        if self._min_ttl is None or answer.ttl < self._min_ttl:
+            self._min_ttl = answer.ttl
+
+    def min_record_ttl(self) -> Optional[int]:
+        """Return the smallest TTL among the answers, or None if there are none."""
+        return self._min_ttl
+
+    def records_for(self, name: str) -> Tuple[ResourceRecord, ...]:
+        """Return the answers for a fully qualified name (without trailing dot)."""
+        return self._by_name.get(name, ())
+
+    def _flags(self) -> int:
+        flags = 0
+        if self.qr:
+            flags |= 1 << 15
+        flags |= (self.opcode & 0xF) << 11
+        if self.aa:
+            flags |= 1 << 10
+        if self.tc:
+            flags |= 1 << 9
+        if self.rd:
+            flags |= 1 << 8
+        if self.ra:
+            flags |= 1 << 7
+        flags |= (self.z & 0x7) << 4
+        flags |= self.rcode & 0xF
+        return flags
 
     def build_bytes_vec_compressed(self) -> bytes:
         """Build a compressed DNS wire format representation of the packet."""
+        if self._encoded is None:
+            try:
+                self._encoded = self._build_wire()
+            except _Unsupported:
+                self._encoded = self._build_wire_dnspython()
+            except PacketError:
+                raise
+            except Exception as e:
+                raise PacketError(f"Failed to build packet: {str(e)}")
+        return self._encoded
+
+    def _build_wire(self) -> bytes:
+        """Encode the packet directly with struct for the common record types."""
+        buf = bytearray(_HEADER.pack(self.id, self._flags(), 0, len(self.answers), 0, 0))
+        compress = {}
+        for rr in self.answers:
+            rtype = _RTYPE.get(rr.rtype)
+            rclass = _RCLASS.get(rr.rclass)
+            if rtype is None or rclass is None:
+                raise _Unsupported()
+            _encode_name(rr.name, buf, compress)
+            fixed_at = len(buf)
+            buf += _RR_FIXED.pack(rtype, rclass, rr.ttl, 0)
+            _encode_rdata(rr.rtype, rr.rdata, buf, compress)
+            # Patch in RDLENGTH now that the rdata has been written
+            _U16.pack_into(buf, fixed_at + 8, len(buf) - fixed_at - _RR_FIXED.size)
+        return bytes(buf)
+
+    def _build_wire_dnspython(self) -> bytes:
+        """Encode the packet through dnspython; handles every record type it knows."""
         try:
             msg = message.Message(id=self.id)
-            msg.flags = 0
-            if self.qr:
-                msg.flags |= 1 << 15
-            msg.flags |= (self.opcode & 0xF) << 11
-            if self.aa:
-                msg.flags |= 1 << 10
-            if self.tc:
-                msg.flags |= 1 << 9
-            if self.rd:
-                msg.flags |= 1 << 8
-            if self.ra:
-                msg.flags |= 1 << 7
-            msg.flags |= (self.z & 0x7) << 4
-            msg.flags |= self.rcode & 0xF
+            msg.flags = self._flags()
 
             for rr in self.answers:
                 rr_name = name.from_text(rr.name)
-                rr_ttl = rr.ttl
                 rr_rdataclass = rdataclass.from_text(rr.rclass)
                 rr_rdatatype = rdatatype.from_text(rr.rtype)
-                rr_rdata = rdata.from_text(rr_rdataclass, rr_rdatatype, rr.rdata)
-                msg.answer.append((rr_name, rr_ttl, rr_rdata))
+                rr_rdata = rdata.from_text(rr_rdataclass, rr_rdatatype, str(rr.rdata))
+                rrset = msg.find_rrset(msg.answer, rr_name, rr_rdataclass, rr_rdatatype, create=True)
+                rrset.add(rr_rdata, rr.ttl)
 
             return msg.to_wire()
         except Exception as e:
@@ -58,34 +427,12 @@ class Packet:
     @classmethod
     def from_bytes(cls, data: bytes) -> 'Packet':
         """Create a Packet object from DNS wire format bytes."""
-        try:
-            msg = message.from_wire(data)
-            packet = cls(
-                id=msg.id,
-                qr=bool(msg.flags & (1 << 15)),
-                opcode=(msg.flags >> 11) & 0xF,
-                aa=bool(msg.flags & (1 << 10)),
-                tc=bool(msg.flags & (1 << 9)),
-                rd=bool(msg.flags & (1 << 8)),
-                ra=bool(msg.flags & (1 << 7)),
-                z=(msg.flags >> 4) & 0x7,
-                rcode=msg.flags & 0xF
-            )
-
-            for rrset in msg.answer:
-                for rr in rrset:
-                    resource_record = ResourceRecord(
-                        name=rrset.name.to_text(),
-                        rclass=rdataclass.to_text(rr.rdclass),
-                        ttl=rrset.ttl,
-                        rtype=rdatatype.to_text(rr.rdtype),
-                        rdata=rr.to_text()
-                    )
-                    packet.add_answer(resource_record)
-
-            return packet
-        except Exception as e:
-            raise PacketError(f"Failed to parse packet: {str(e)}")
+        data = bytes(data)
+        header, answers = _parse_wire(data)
+        # Each call gets its own Packet; the parsed answers tuple is immutable and shared
+        packet = cls(answers, *header)
+        packet._encoded = data
+        return packet
 
     def __str__(self):
         header = f"Packet ID: {self.id}, QR: {'Response' if self.qr else 'Query'}, " \
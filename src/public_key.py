@@ -1,8 +1,14 @@
+import hashlib
+import hmac
 from .crypto import Crypto
 from .errors import PublicKeyError
 
 class PublicKey:
+    __slots__ = ('key', '_z32', '_info_hash')
+
     def __init__(self, key):
+        self._z32 = None
+        self._info_hash = None
         if isinstance(key, str):
             try:
                 self.key = Crypto.z_base_32_decode(key)
@@ -23,17 +29,25 @@ class PublicKey:
 
     def __eq__(self, other):
         if isinstance(other, PublicKey):
-            return self.key == other.key
+            return hmac.compare_digest(self.key, other.key)
         return False
 
     def __hash__(self):
         return hash(self.key)
 
     def to_z32(self):
-        return Crypto.z_base_32_encode(self.key)
+        if self._z32 is None:
+            self._z32 = Crypto.z_base_32_encode(self.key)
+        return self._z32
 
     def to_bytes(self):
         return self.key
 
+    def info_hash(self) -> bytes:
+        """Return the 20-byte DHT info_hash (SHA-1 of the key)."""
+        if self._info_hash is None:
+            self._info_hash = hashlib.sha1(self.key).digest()
+        return self._info_hash
+
     def verify(self, message: bytes, signature: bytes) -> bool:
         return Crypto.verify(self.key, message, signature)
\ No newline at end of file
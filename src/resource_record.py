@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from typing import Union
 import ipaddress
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ResourceRecord:
     name: str
     rclass: str
@@ -11,14 +11,15 @@ class ResourceRecord:
     rdata: Union[str, ipaddress.IPv4Address, ipaddress.IPv6Address]
 
     def __post_init__(self):
-        self.name = self.name.lower()
-        self.rclass = self.rclass.upper()
-        self.rtype = self.rtype.upper()
+        # Frozen: normalize through object.__setattr__ once, at construction
+        object.__setattr__(self, 'name', self.name.lower())
+        object.__setattr__(self, 'rclass', self.rclass.upper())
+        object.__setattr__(self, 'rtype', self.rtype.upper())
 
         if self.rtype == 'A':
-            self.rdata = ipaddress.IPv4Address(self.rdata)
+            object.__setattr__(self, 'rdata', ipaddress.IPv4Address(self.rdata))
         elif self.rtype == 'AAAA':
-            self.rdata = ipaddress.IPv6Address(self.rdata)
+            object.__setattr__(self, 'rdata', ipaddress.IPv6Address(self.rdata))
 
     def to_wire_format(self) -> bytes:
         # This is a placeholder. You'll need to implement the actual DNS wire format encoding.
@@ -1,47 +1,57 @@
+import functools
+import hashlib
+import hmac
+import os
 import time
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from typing import List, Optional
-import ed25519
-from dns import message, name, rdata, rdatatype, rdataclass
-
-@dataclass
-class PublicKey:
-    key: bytes
-
-    def to_z32(self) -> str:
-        # Implement z-base-32 encoding here
-        pass
-
-@dataclass
-class ResourceRecord:
-    name: str
-    rclass: int
-    ttl: int
-    rdata: bytes
-
-@dataclass
-class Packet:
-    answers: List[ResourceRecord]
-
-    @classmethod
-    def new_reply(cls, id: int):
-        return cls(answers=[])
-
-    def build_bytes_vec_compressed(self) -> bytes:
-        # Implement DNS packet compression here
-        pass
-
-@dataclass
+from .public_key import PublicKey
+from .packet import Packet
+from .errors import PkarrError
+
+# Below this many distinct payloads a thread pool costs more than it saves
+PARALLEL_VERIFY_THRESHOLD = 64
+
+# Bencoded {"seq": timestamp, "v": <value>} as signed under BEP 44, minus the
+# outer dict markers
+_SIGNABLE_TEMPLATE = b"3:seqi%de1:v%d:"
+
+@functools.lru_cache(maxsize=1024)
+def normalize_name(origin: str, name: str) -> str:
+    """Qualify a record name relative to the packet's origin (the z-base-32 key)."""
+    if name.endswith('.'):
+        name = name[:-1]
+
+    # Only the last label matters; avoid materialising the full split
+    i = name.rfind('.')
+    last = name if i < 0 else name[i + 1:]
+
+    if last == origin:
+        return name
+    if last in ('@', ''):
+        return origin
+    return f"{name}.{origin}"
+
+@dataclass(slots=True)
 class SignedPacket:
     public_key: PublicKey
     signature: bytes
     timestamp: int
     packet: Packet
     last_seen: int
+    _origin: str = field(init=False, repr=False)
+    _cached_bytes: Optional[bytes] = field(default=None, init=False, repr=False)
+    _cache_key: Optional[bytes] = field(default=None, init=False, repr=False)
+
+    def __post_init__(self):
+        self._origin = self.public_key.to_z32()
 
     @classmethod
     def from_packet(cls, keypair, packet: Packet):
-        timestamp = int(time.time() * 1_000_000)
+        # One clock read (integer microseconds) for both timestamp and last_seen
+        now = time.time_ns() // 1_000
+        timestamp = now
         encoded_packet = packet.build_bytes_vec_compressed()
 
         if len(encoded_packet) > 1000:
@@ -50,11 +60,11 @@ class SignedPacket:
         signature = keypair.sign(cls.signable(timestamp, encoded_packet))
 
         return cls(
-            public_key=keypair.public_key(),
+            public_key=keypair.public_key,
             signature=signature,
             timestamp=timestamp,
             packet=packet,
-            last_seen=int(time.time() * 1_000_000)
+            last_seen=now
         )
 
     @classmethod
@@ -64,48 +74,94 @@ class SignedPacket:
         if len(data) > 1104:
             raise ValueError("Packet too large")
 
-        public_key = PublicKey(data[:32])
-        signature = data[32:96]
-        timestamp = int.from_bytes(data[96:104], 'big')
-        encoded_packet = data[104:]
+        # Read fields through a view; only what the packet keeps is copied out
+        view = memoryview(data)
+        public_key = PublicKey(bytes(view[:32]))
+        signature = bytes(view[32:96])
+        timestamp = int.from_bytes(view[96:104], 'big')
+        encoded_packet = view[104:]
 
         # Verify signature
         if not public_key.verify(cls.signable(timestamp, encoded_packet), signature):
             raise ValueError("Invalid signature")
 
-        packet = Packet([])  # Parse encoded_packet into a Packet object here
+        # Packet.from_bytes keeps the received bytes as the packet's encoding, so
+        # as_bytes() reproduces exactly what was signed without re-encoding.
+        packet = Packet.from_bytes(bytes(encoded_packet))
 
         return cls(
             public_key=public_key,
             signature=signature,
             timestamp=timestamp,
             packet=packet,
-            last_seen=int(time.time() * 1_000_000)
+            last_seen=time.time_ns() // 1_000
         )
 
+    @classmethod
+    def from_bytes_batch(cls, blobs: List[bytes]) -> List[Optional['SignedPacket']]:
+        """Parse and verify many packets; entries that fail come back as None.
+
+        Each distinct payload is verified once and duplicates within the
+        batch share the result.
+        """
+        parsed = {}
+        packets = []
+        for data in blobs:
+            data = bytes(data)
+            if data not in parsed:
+                try:
+                    parsed[data] = cls.from_bytes(data)
+                except (ValueError, PkarrError):
+                    parsed[data] = None
+            packets.append(parsed[data])
+        return packets
+
+    @classmethod
+    def from_bytes_many(cls, blobs: List[bytes], workers: Optional[int] = None) -> List[Optional['SignedPacket']]:
+        """Like from_bytes_batch, but verifies distinct payloads on a thread pool.
+
+        libsodium runs with the GIL released, so verification scales across
+        cores. Small batches take the single-threaded path.
+        """
+        blobs = [bytes(data) for data in blobs]
+        unique = list(dict.fromkeys(blobs))
+        workers = workers or os.cpu_count() or 1
+        if workers == 1 or len(unique) < PARALLEL_VERIFY_THRESHOLD:
+            return cls.from_bytes_batch(blobs)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            parsed = dict(zip(unique, executor.map(cls._from_bytes_or_none, unique)))
+        return [parsed[data] for data in blobs]
+
+    @classmethod
+    def _from_bytes_or_none(cls, data: bytes) -> Optional['SignedPacket']:
+        try:
+            return cls.from_bytes(data)
+        except (ValueError, PkarrError):
+            return None
+
     def as_bytes(self) -> bytes:
-        return (
-            self.public_key.key +
-            self.signature +
-            self.timestamp.to_bytes(8, 'big') +
-            self.packet.build_bytes_vec_compressed()
-        )
+        if self._cached_bytes is None:
+            encoded_packet = self.packet.build_bytes_vec_compressed()
+            buf = bytearray(104 + len(encoded_packet))
+            buf[0:32] = self.public_key.key
+            buf[32:96] = self.signature
+            buf[96:104] = self.timestamp.to_bytes(8, 'big')
+            buf[104:] = encoded_packet
+            self._cached_bytes = bytes(buf)
+        return self._cached_bytes
 
     def to_relay_payload(self) -> bytes:
         return self.as_bytes()[32:]
 
     def resource_records(self, name: str):
-        origin = self.public_key.to_z32()
-        normalized_name = self.normalize_name(origin, name)
-        return [rr for rr in self.packet.answers if rr.name == normalized_name]
+        return list(self.packet.records_for(normalize_name(self._origin, name)))
 
     def fresh_resource_records(self, name: str):
-        origin = self.public_key.to_z32()
-        normalized_name = self.normalize_name(origin, name)
         current_time = int(time.time())
         return [
-            rr for rr in self.packet.answers
-            if rr.name == normalized_name and rr.ttl > (current_time - self.last_seen // 1_000_000)
+            rr for rr in self.packet.records_for(normalize_name(self._origin, name))
+            if rr.ttl > (current_time - self.last_seen // 1_000_000)
         ]
 
     def expires_in(self, min_ttl: int, max_ttl: int) -> int:
@@ -114,41 +170,55 @@ class SignedPacket:
         return max(0, ttl - elapsed)
 
     def ttl(self, min_ttl: int, max_ttl: int) -> int:
-        if not self.packet.answers:
+        min_record_ttl = self.packet.min_record_ttl()
+        if min_record_ttl is None:
             return min_ttl
-        min_record_ttl = min(rr.ttl for rr in self.packet.answers)
         return max(min_ttl, min(max_ttl, min_record_ttl))
 
     def elapsed(self) -> int:
-        return (int(time.time() * 1_000_000) - self.last_seen) // 1_000_000
+        return (time.time_ns() // 1_000 - self.last_seen) // 1_000_000
 
     @staticmethod
     def signable(timestamp: int, v: bytes) -> bytes:
-        return f"3:seqi{timestamp}e1:v{len(v)}:".encode() + v
-
-    @staticmethod
-    def normalize_name(origin: str, name: str) -> str:
-        if name.endswith('.'):
-            name = name[:-1]
+        # One C-level %-format of the fixed bencode prefix, then the value
+        return _SIGNABLE_TEMPLATE % (timestamp, len(v)) + v
+
+    normalize_name = staticmethod(normalize_name)
+
+    def __eq__(self, other):
+        # The signature covers timestamp and packet, so key + signature identify
+        # the packet; compare in constant time so a near-match isn't leaked.
+        if not isinstance(other, SignedPacket):
+            return NotImplemented
+        return hmac.compare_digest(
+            self.public_key.key + self.signature,
+            other.public_key.key + other.signature
+        )
 
-        parts = name.split('.')
-        last = parts[-1]
+    def __hash__(self):
+        return hash(self.cache_key())
 
-        if last == origin:
-            return name
-        if last in ('@', ''):
-            return origin
-        return f"{name}.{origin}"
+    def cache_key(self) -> bytes:
+        """Return a 16-byte BLAKE2b digest of key + signature for de-duplicating stored packets."""
+        if self._cache_key is None:
+            h = hashlib.blake2b(digest_size=16)
+            h.update(self.public_key.key)
+            h.update(self.signature)
+            self._cache_key = h.digest()
+        return self._cache_key
 
     def __str__(self):
-        records = "\n".join(
-            f"        {rr.name}  IN  {rr.ttl}  {rr.rdata}"
-            for rr in self.packet.answers
-        )
-        return f"""SignedPacket ({self.public_key.key.hex()}):
-    last_seen: {self.elapsed()} seconds ago
-    timestamp: {self.timestamp},
-    signature: {self.signature.hex()}
-    records:
-{records}
-"""
\ No newline at end of file
+        # rdata is already text or an ip address, so str() is all it needs
+        lines = []
+        for rr in self.packet.answers:
+            lines += ("        ", rr.name, "  IN  ", str(rr.ttl), "  ", str(rr.rdata), "\n")
+        if lines:
+            lines.pop()
+        return (
+            "SignedPacket (%s):\n"
+            "    last_seen: %d seconds ago\n"
+            "    timestamp: %d,\n"
+            "    signature: %s\n"
+            "    records:\n"
+            "%s\n"
+        ) % (self.public_key.key.hex(), self.elapsed(), self.timestamp, self.signature.hex(), "".join(lines))
\ No newline at end of file
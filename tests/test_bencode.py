@@ -0,0 +1,17 @@
+import unittest
+
+from src import _bencode
+
+
+class LoadsTest(unittest.TestCase):
+    def test_disordered_keys_fall_back_to_lenient_decoder(self):
+        self.assertEqual(dict(_bencode.loads(b'd1:bi1e1:ai2ee')), {b'b': 1, b'a': 2})
+
+    @unittest.skipIf(_bencode._bdecode is None, "fastbencode not installed")
+    def test_trailing_junk_is_rejected(self):
+        with self.assertRaises(ValueError):
+            _bencode.loads(b'd1:ai1eejunk')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import unittest
+from unittest import mock
+
+from src.client import Node, PkarrClient
+from src.keypair import Keypair
+
+
+class CacheTest(unittest.TestCase):
+    def setUp(self):
+        self.client = PkarrClient(Keypair.random(), [])
+        self.packet = object()
+
+    def test_fresh_entry_is_returned(self):
+        with mock.patch('src.client.time.monotonic', return_value=100.0):
+            self.client._cache_put('k', self.packet, 200.0)
+            self.assertIs(self.client._cache_get('k'), self.packet)
+
+    def test_expired_entry_is_dropped(self):
+        self.client._cache_put('k', self.packet, 200.0)
+        with mock.patch('src.client.time.monotonic', return_value=200.0):
+            self.assertIsNone(self.client._cache_get('k'))
+        self.assertNotIn('k', self.client.cache)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        self.client.cache_max = 2
+        with mock.patch('src.client.time.monotonic', return_value=0.0):
+            self.client._cache_put('a', self.packet, 10.0)
+            self.client._cache_put('b', self.packet, 10.0)
+            # Reading 'a' makes 'b' the least recently used
+            self.client._cache_get('a')
+            self.client._cache_put('c', self.packet, 10.0)
+        self.assertEqual(list(self.client.cache), ['a', 'c'])
+
+
+class LookupTest(unittest.IsolatedAsyncioTestCase):
+    async def test_address_is_queried_once_whatever_its_node_id(self):
+        client = PkarrClient(Keypair.random(), ['127.0.0.1:7000'])
+        addresses = [('127.0.0.1', 7000 + i) for i in range(20)]
+        queried = []
+
+        async def request_packet(node, target_key, record_type=None):
+            queried.append(node.sockaddr)
+            # Every reply lists the same addresses under fresh random IDs
+            return [Node(host, port, (host, port), os.urandom(20)) for host, port in addresses]
+
+        with mock.patch.object(client, '_ensure_protocol', mock.AsyncMock()), \
+                mock.patch.object(client, '_request_packet', request_packet):
+            result = await client.lookup(Keypair.random().public_key.to_z32(), max_attempts=200, timeout=5)
+
+        self.assertIsNone(result)
+        self.assertEqual(sorted(queried), addresses)
+
+
+if __name__ == '__main__':
+    unittest.main()
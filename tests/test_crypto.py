@@ -0,0 +1,94 @@
+import os
+import unittest
+
+from src.crypto import _L, _P, _VERIFY_CACHE, Crypto, _is_canonical
+
+_Z32_ALPHABET = "ybndrfg8ejkmcpqxot1uwisza345h769"
+
+
+def _reference_encode(data: bytes) -> str:
+    """Bit-at-a-time z-base-32, as originally implemented."""
+    result = ""
+    bits = value = 0
+    for byte in data:
+        value = (value << 8) | byte
+        bits += 8
+        while bits >= 5:
+            bits -= 5
+            result += _Z32_ALPHABET[(value >> bits) & 31]
+    if bits > 0:
+        result += _Z32_ALPHABET[(value << (5 - bits)) & 31]
+    return result
+
+
+class ZBase32Test(unittest.TestCase):
+    def test_known_values(self):
+        self.assertEqual(Crypto.z_base_32_encode(b""), "")
+        self.assertEqual(Crypto.z_base_32_encode(b"\x00"), "yy")
+        self.assertEqual(Crypto.z_base_32_encode(b"\xff"), "9h")
+        self.assertEqual(Crypto.z_base_32_encode(b"\xff" * 5), "99999999")
+
+    def test_matches_reference_for_every_length(self):
+        for size in range(0, 41):
+            data = os.urandom(size)
+            with self.subTest(size=size):
+                encoded = Crypto.z_base_32_encode(data)
+                self.assertEqual(encoded, _reference_encode(data))
+                self.assertEqual(Crypto.z_base_32_decode(encoded), data)
+
+    def test_public_key_round_trip(self):
+        key = os.urandom(32)
+        encoded = Crypto.z_base_32_encode(key)
+        self.assertEqual(len(encoded), 52)
+        self.assertEqual(Crypto.z_base_32_decode(encoded), key)
+
+    def test_invalid_character_raises_value_error(self):
+        for encoded in ("yyl", "YY", "yy0", "yy "):
+            with self.subTest(encoded=encoded), self.assertRaises(ValueError):
+                Crypto.z_base_32_decode(encoded)
+
+
+class VerifyTest(unittest.TestCase):
+    MESSAGE = b"3:seqi1e1:v0:"
+
+    def setUp(self):
+        _VERIFY_CACHE.clear()
+        secret_key, self.public_key = Crypto.generate_keypair()
+        self.signature = Crypto.sign(secret_key, self.MESSAGE)
+
+    def test_valid_signature_passes(self):
+        self.assertTrue(_is_canonical(self.public_key, self.signature))
+        self.assertTrue(Crypto.verify(self.public_key, self.MESSAGE, self.signature))
+
+    def test_s_plus_l_is_rejected(self):
+        s = int.from_bytes(self.signature[32:], 'little')
+        malleated = self.signature[:32] + (s + _L).to_bytes(32, 'little')
+        self.assertFalse(_is_canonical(self.public_key, malleated))
+        self.assertFalse(Crypto.verify(self.public_key, self.MESSAGE, malleated))
+
+    def test_non_canonical_r_is_rejected(self):
+        signature = _P.to_bytes(32, 'little') + self.signature[32:]
+        self.assertFalse(_is_canonical(self.public_key, signature))
+        self.assertFalse(Crypto.verify(self.public_key, self.MESSAGE, signature))
+
+    def test_non_canonical_public_key_is_rejected(self):
+        public_key = (_P + 1).to_bytes(32, 'little')
+        self.assertFalse(_is_canonical(public_key, self.signature))
+        self.assertFalse(Crypto.verify(public_key, self.MESSAGE, self.signature))
+
+    def test_wrong_signature_length_is_rejected(self):
+        for signature in (self.signature[:63], self.signature + b"\x00", b""):
+            with self.subTest(length=len(signature)):
+                self.assertFalse(Crypto.verify(self.public_key, self.MESSAGE, signature))
+
+    def test_cached_failure_does_not_reject_valid_signature(self):
+        tampered = bytes([self.signature[0] ^ 1]) + self.signature[1:]
+        self.assertFalse(Crypto.verify(self.public_key, self.MESSAGE, tampered))
+        self.assertFalse(Crypto.verify(self.public_key, self.MESSAGE + b"x", self.signature))
+        self.assertTrue(Crypto.verify(self.public_key, self.MESSAGE, self.signature))
+        # And the failures stay failures when served from the cache
+        self.assertFalse(Crypto.verify(self.public_key, self.MESSAGE, tampered))
+
+
+if __name__ == '__main__':
+    unittest.main()
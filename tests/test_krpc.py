@@ -0,0 +1,45 @@
+import asyncio
+import unittest
+
+from src.krpc import KrpcProtocol
+
+NODE = ('127.0.0.1', 6881)
+
+
+class DatagramReceivedTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        loop = asyncio.get_running_loop()
+        _, self.protocol = await loop.create_datagram_endpoint(KrpcProtocol, local_addr=('127.0.0.1', 0))
+        self.query = asyncio.create_task(self.protocol.request(b'', b'aa', NODE, timeout=1))
+        await asyncio.sleep(0)
+
+    async def asyncTearDown(self):
+        self.query.cancel()
+        self.protocol.close()
+
+    async def test_reply_from_queried_node_resolves(self):
+        self.protocol.datagram_received(b'd1:t2:aa1:y1:re', NODE)
+        response, addr = await self.query
+        self.assertEqual(response[b'y'], b'r')
+        self.assertEqual(addr, NODE)
+
+    async def test_reply_from_other_address_is_dropped(self):
+        self.protocol.datagram_received(b'd1:t2:aa1:y1:re', ('127.0.0.2', 6881))
+        self.protocol.datagram_received(b'd1:t2:aa1:y1:re', ('127.0.0.1', 6882))
+        await asyncio.sleep(0)
+        self.assertFalse(self.query.done())
+
+    async def test_non_bytes_transaction_id_is_dropped(self):
+        self.protocol.datagram_received(b'd1:tli1ee1:y1:re', NODE)
+        self.protocol.datagram_received(b'd1:td1:ai1ee1:y1:re', NODE)
+        await asyncio.sleep(0)
+        self.assertFalse(self.query.done())
+
+    async def test_undecodable_datagram_is_dropped(self):
+        self.protocol.datagram_received(b'not bencode', NODE)
+        await asyncio.sleep(0)
+        self.assertFalse(self.query.done())
+
+
+if __name__ == '__main__':
+    unittest.main()
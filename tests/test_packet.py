@@ -0,0 +1,109 @@
+import time
+import unittest
+
+from src.errors import PacketError
+from src.packet import Packet, _parse_wire, _parse_wire_direct, _parse_wire_dnspython
+from src.resource_record import ResourceRecord
+
+
+class TxtEncodingTest(unittest.TestCase):
+    def test_long_token_before_backslash_does_not_backtrack(self):
+        # An escape after a long bare token used to backtrack exponentially
+        value = 'a' * 200 + '\\065'
+        start = time.perf_counter()
+        wire = Packet([ResourceRecord('_t.k.', 'IN', 300, 'TXT', value)]).build_bytes_vec_compressed()
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual(Packet.from_bytes(wire).answers[0].rdata, '"' + 'a' * 200 + 'A"')
+
+    def test_txt_round_trip(self):
+        record = ResourceRecord('_t.k.', 'IN', 300, 'TXT', '"hello world" bare')
+        wire = Packet([record]).build_bytes_vec_compressed()
+        self.assertEqual(Packet.from_bytes(wire).answers, (ResourceRecord('_t.k.', 'IN', 300, 'TXT', '"hello world" "bare"'),))
+
+
+class ClassEncodingTest(unittest.TestCase):
+    def test_non_in_class_round_trips_through_dnspython(self):
+        record = ResourceRecord('k.', 'CH', 30, 'TXT', '"chaos"')
+        wire = Packet([record]).build_bytes_vec_compressed()
+        self.assertEqual(Packet.from_bytes(wire).answers, (record,))
+
+    def test_non_in_layout_is_refused_at_build_time(self):
+        # CH A rdata is a domain and an address, not an IPv4 address
+        packet = Packet([ResourceRecord('k.', 'CH', 30, 'A', '1.2.3.4')])
+        with self.assertRaises(PacketError):
+            packet.build_bytes_vec_compressed()
+
+
+class RecordIndexTest(unittest.TestCase):
+    def test_records_for_cannot_alter_the_index(self):
+        record = ResourceRecord('a.k.', 'IN', 30, 'A', '1.2.3.4')
+        packet = Packet([record])
+        with self.assertRaises(AttributeError):
+            packet.records_for('a.k').append(record)
+        self.assertEqual(packet.records_for('a.k'), (record,))
+        self.assertEqual(packet.records_for('b.k'), ())
+
+    def test_index_follows_answers(self):
+        packet = Packet([ResourceRecord('a.k.', 'IN', 30, 'A', '1.2.3.4')])
+        packet.add_answer(ResourceRecord('a.k.', 'IN', 10, 'A', '5.6.7.8'))
+        self.assertEqual(len(packet.records_for('a.k')), 2)
+        self.assertEqual(packet.min_record_ttl(), 10)
+        packet.answers = [ResourceRecord('b.k.', 'IN', 60, 'A', '9.9.9.9')]
+        self.assertEqual(packet.records_for('a.k'), ())
+        self.assertEqual(packet.min_record_ttl(), 60)
+
+
+class WireDecodingTest(unittest.TestCase):
+    """The direct decoder must agree with dnspython on everything it accepts."""
+
+    RECORDS = {
+        'A': ResourceRecord('k.', 'IN', 30, 'A', '1.2.3.4'),
+        'AAAA': ResourceRecord('k.', 'IN', 30, 'AAAA', '::ffff:1.2.3.4'),
+        'CNAME': ResourceRecord('www.k.', 'IN', 60, 'CNAME', 'k.'),
+        'NS': ResourceRecord('k.', 'IN', 60, 'NS', 'ns1.k.'),
+        'MX': ResourceRecord('k.', 'IN', 60, 'MX', '10 mail.k.'),
+        'SRV': ResourceRecord('_s._tcp.k.', 'IN', 60, 'SRV', '1 2 443 srv.k.'),
+        'TXT': ResourceRecord('_t.k.', 'IN', 300, 'TXT', '"quote \\" back \\\\ high \\200" "second"'),
+    }
+
+    def assertDecodersAgree(self, wire):
+        direct = _parse_wire_direct(wire)
+        self.assertEqual(direct, _parse_wire_dnspython(wire))
+        return direct
+
+    def test_each_record_type(self):
+        for rtype, record in self.RECORDS.items():
+            with self.subTest(rtype=rtype):
+                wire = Packet([record]).build_bytes_vec_compressed()
+                _, answers = self.assertDecodersAgree(wire)
+                self.assertEqual(answers, (record,))
+
+    def test_compressed_packet_with_every_type(self):
+        wire = Packet(list(self.RECORDS.values())).build_bytes_vec_compressed()
+        self.assertDecodersAgree(wire)
+
+    def test_ttl_with_top_bit_set_is_zero(self):
+        wire = Packet([ResourceRecord('k.', 'IN', 0x80000000, 'A', '1.2.3.4')]).build_bytes_vec_compressed()
+        _, answers = self.assertDecodersAgree(wire)
+        self.assertEqual(answers[0].ttl, 0)
+
+    def test_records_group_into_rrsets(self):
+        records = [
+            ResourceRecord('k.', 'IN', 300, 'A', '1.1.1.1'),
+            ResourceRecord('k.', 'IN', 60, 'TXT', '"x"'),
+            ResourceRecord('K.', 'IN', 30, 'A', '2.2.2.2'),
+            ResourceRecord('k.', 'IN', 300, 'A', '1.1.1.1'),
+        ]
+        wire = Packet(records).build_bytes_vec_compressed()
+        _, answers = self.assertDecodersAgree(wire)
+        self.assertEqual([(rr.rtype, rr.ttl) for rr in answers], [('A', 30), ('A', 30), ('TXT', 60)])
+
+    def test_truncated_packets_raise_packet_error(self):
+        wire = Packet(list(self.RECORDS.values())).build_bytes_vec_compressed()
+        for size in range(len(wire)):
+            with self.assertRaises(PacketError):
+                _parse_wire(wire[:size])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+from unittest import mock
+
+from src.keypair import Keypair
+from src.packet import Packet
+from src.resource_record import ResourceRecord
+from src.signed_packet import SignedPacket
+
+
+def _signed_blob(index: int) -> bytes:
+    record = ResourceRecord('@', 'IN', 300, 'TXT', '"v%d"' % index)
+    return SignedPacket.from_packet(Keypair.random(), Packet([record])).as_bytes()
+
+
+def _tampered(blob: bytes) -> bytes:
+    return blob[:-1] + bytes([blob[-1] ^ 1])
+
+
+class FromBytesBatchTest(unittest.TestCase):
+    def test_invalid_entries_are_none_in_place(self):
+        good, other = _signed_blob(0), _signed_blob(1)
+        packets = SignedPacket.from_bytes_batch([good, _tampered(good), b'short', other])
+        self.assertEqual(packets[0].as_bytes(), good)
+        self.assertIsNone(packets[1])
+        self.assertIsNone(packets[2])
+        self.assertEqual(packets[3].as_bytes(), other)
+
+    def test_duplicates_share_one_packet(self):
+        blob = _signed_blob(0)
+        packets = SignedPacket.from_bytes_batch([blob, bytearray(blob), blob])
+        self.assertIs(packets[0], packets[1])
+        self.assertIs(packets[0], packets[2])
+
+
+class FromBytesManyTest(unittest.TestCase):
+    def setUp(self):
+        self.good = [_signed_blob(i) for i in range(4)]
+        self.blobs = self.good[:2] + [_tampered(self.good[2]), self.good[0], self.good[3], b'short']
+
+    def check(self, packets):
+        self.assertEqual([p and p.as_bytes() for p in packets],
+                         [self.good[0], self.good[1], None, self.good[0], self.good[3], None])
+        self.assertIs(packets[0], packets[3])
+
+    def test_thread_pool_path(self):
+        with mock.patch('src.signed_packet.PARALLEL_VERIFY_THRESHOLD', 1):
+            self.check(SignedPacket.from_bytes_many(self.blobs, workers=4))
+
+    def test_small_batch_path(self):
+        self.check(SignedPacket.from_bytes_many(self.blobs, workers=1))
+
+
+if __name__ == '__main__':
+    unittest.main()